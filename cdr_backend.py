@@ -1,132 +1,161 @@
-import re
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-from openpyxl import load_workbook, Workbook
+from openpyxl import Workbook
 
 cdr_file = "CDR_VREP.xlsx"
 wizard_file = "report_file.xlsx"
 output_file = "output.xlsx"
 
+logger = logging.getLogger(__name__)
+
+# Placeholder strings that clean_dataframe blanks out alongside real NaN/None.
+_NA_TOKENS = ["NaN", "<NA>", "None", "NULL", "nan"]
+
+# The only CDR Summary columns either sheet builder reads.
+_CDR_COLUMNS = {"Account Number", "Investor ID", "Investor Commitment"}
+
+# calamine parses xlsx far faster than openpyxl; use it when it is installed.
+try:
+    import python_calamine  # noqa: F401
+    _READ_ENGINE = "calamine"
+except ImportError:
+    _READ_ENGINE = "openpyxl"
+
 # ---------------------------------------------------------
 # Utility functions
 # ---------------------------------------------------------
-def ensure_output_file_exists():
-    """Ensure output file exists."""
-    try:
-        load_workbook(output_file)
-    except FileNotFoundError:
-        Workbook().save(output_file)
-
-def delete_sheet_if_exists(path, sheet_name):
-    """Delete sheet if it already exists."""
-    wb = load_workbook(path)
-    if sheet_name in wb.sheetnames:
-        del wb[sheet_name]
-        wb.save(path)
-    wb.close()
-
 def norm_key(x) -> str:
     """Normalize keys for consistent matching."""
     s = str(x).strip()
     if s.endswith(".0"):
         s = s[:-2]
-    s = s.replace("\u00A0", " ")
-    s = re.sub(r"[ ,\-]", "", s)
+    # Plain str.replace calls beat a regex sub for deleting a few fixed characters.
+    s = s.replace("\u00A0", "").replace(" ", "").replace(",", "").replace("-", "")
     return s.upper()
 
 def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """Replace all NaN, <NA>, None, NULL, etc. with blank and convert to object dtype."""
-    df = df.replace(
-        to_replace=[pd.NA, None, np.nan, "NaN", "<NA>", "None", "NULL", "nan"],
-        value=""
-    )
-    return df.astype(object)
+    df = df.astype(object)
+    # One combined mask instead of a separate replace pass per token.
+    return df.mask(df.isna() | df.isin(_NA_TOKENS), "")
+
+def _is_cdr_column(name):
+    # Headers are compared stripped, since the builders strip them after reading.
+    return str(name).strip() in _CDR_COLUMNS
+
+def _read_cdr_sheets():
+    with pd.ExcelFile(cdr_file, engine=_READ_ENGINE) as xl:
+        return {"CDR Summary By Investor": xl.parse("CDR Summary By Investor", skiprows=2, usecols=_is_cdr_column)}
+
+def _read_wizard_sheets():
+    with pd.ExcelFile(wizard_file, engine=_READ_ENGINE) as xl:
+        return {
+            "Data_format": xl.parse("Data_format"),
+            "investern_format": xl.parse("investern_format"),
+            "allocation_data": xl.parse("allocation_data", header=None),
+        }
+
+def read_input_sheets():
+    """Read every input sheet up front, opening each workbook only once.
+
+    The two workbooks are independent, so they are read on separate threads.
+    """
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(_read_cdr_sheets), pool.submit(_read_wizard_sheets)]
+        sheets = {}
+        for future in futures:
+            sheets.update(future.result())
+    return sheets
 
 # ---------------------------------------------------------
 # Step 1: Create Commitment Sheet
 # ---------------------------------------------------------
-def create_commitment_sheet():
-    ensure_output_file_exists()
-    delete_sheet_if_exists(output_file, "Commitment Sheet")
+def create_commitment_sheet(sheets=None):
+    if sheets is None:
+        sheets = read_input_sheets()
 
     # ---- 1. Load CDR Summary By Investor ----
-    cdr = pd.read_excel(
-        cdr_file,
-        sheet_name="CDR Summary By Investor",
-        engine="openpyxl",
-        skiprows=2
-    )
+    cdr = sheets["CDR Summary By Investor"].copy()
     cdr.columns = cdr.columns.str.strip()
     cdr["Account Number"] = cdr["Account Number"].apply(norm_key)
     cdr["Investor Commitment"] = pd.to_numeric(cdr["Investor Commitment"], errors="coerce").fillna(0)
-    acct_to_commit = cdr.set_index("Account Number")["Investor Commitment"].to_dict()
+    acct_to_commit = dict(zip(cdr["Account Number"].to_numpy(), cdr["Investor Commitment"].to_numpy()))
 
     # ---- 2. Load Data_format ----
-    df = pd.read_excel(wizard_file, sheet_name="Data_format", engine="openpyxl")
+    df = sheets["Data_format"].copy()
     df.columns = df.columns.str.strip()
     df["Legal Entity"] = df["Legal Entity"].astype(str).str.strip()
     df["Commitment Amount"] = pd.to_numeric(df["Commitment Amount"], errors="coerce").fillna(0)
     df["_bin_norm"] = df["Bin ID"].apply(norm_key)
     df["_inv_acct_norm"] = df["Investran Acct ID"].apply(norm_key)
 
-    subtotal_mask = df["Legal Entity"].str.contains("Subtotal", case=False, na=False)
+    subtotal_mask = df["Legal Entity"].str.lower().str.contains("subtotal", regex=False, na=False)
 
     # ---- 3. GS Commitment ----
     df["GS Commitment"] = df["_bin_norm"].map(acct_to_commit)
     df.loc[subtotal_mask, "GS Commitment"] = np.nan
     df["GS Commitment"] = pd.to_numeric(df["GS Commitment"], errors="coerce").fillna(0)
-    df["Commitment Amount"] = pd.to_numeric(df["Commitment Amount"], errors="coerce").fillna(0)
     df["GS Check"] = df["Commitment Amount"] - df["GS Commitment"]
 
     # ---- 4. SS Commitment ----
     # ---- 4. SS Commitment (Now from CDR Summary By Investor) ----
 
-# Create Investor ID → Investor Commitment mapping from CDR Summary
-cdr_investor_map = (
-    cdr[["Investor ID", "Investor Commitment"]]
-    .dropna(subset=["Investor ID"])
-    .copy()
-)
-cdr_investor_map["Investor ID"] = cdr_investor_map["Investor ID"].astype(str).str.strip().str.upper()
-cdr_investor_map["Investor Commitment"] = pd.to_numeric(cdr_investor_map["Investor Commitment"], errors="coerce").fillna(0)
-investorid_to_commitment = cdr_investor_map.set_index("Investor ID")["Investor Commitment"].to_dict()
-
-# Read Investern Format as before
-investern = pd.read_excel(wizard_file, sheet_name="investern_format", engine="openpyxl")
-investern.columns = investern.columns.str.strip()
-
-# Clean Investor ID column (retain your working logic)
-investern["Investor ID"] = investern["Investor ID"].astype(str).str.strip().str.upper()
-investern["Investor ID"] = investern["Investor ID"].replace(
-    to_replace=["NAN", "NONE", "NULL", "<NA>", "NA", "N/A", "PD.NA"], value=""
-)
-investern["Investor ID"] = investern["Investor ID"].where(investern["Investor ID"] != "nan", "")
+    # Create Investor ID → Investor Commitment mapping from CDR Summary
+    cdr_investor_map = (
+        cdr[["Investor ID", "Investor Commitment"]]
+        .dropna(subset=["Investor ID"])
+        .copy()
+    )
+    cdr_investor_map["Investor ID"] = cdr_investor_map["Investor ID"].astype(str).str.strip().str.upper()
+    cdr_investor_map["Investor Commitment"] = pd.to_numeric(cdr_investor_map["Investor Commitment"], errors="coerce").fillna(0)
+    investorid_to_commitment = dict(zip(
+        cdr_investor_map["Investor ID"].to_numpy(),
+        cdr_investor_map["Investor Commitment"].to_numpy(),
+    ))
+
+    # Read Investern Format as before
+    investern = sheets["investern_format"].copy()
+    investern.columns = investern.columns.str.strip()
+
+    # Clean Investor ID column (retain your working logic)
+    investern["Investor ID"] = investern["Investor ID"].astype(str).str.strip().str.upper()
+    investern["Investor ID"] = investern["Investor ID"].replace(
+        to_replace=["NAN", "NONE", "NULL", "<NA>", "NA", "N/A", "PD.NA"], value=""
+    )
 
-# Normalize ID
-investern["_id_norm"] = investern["Investor ID"].apply(lambda x: norm_key(x) if x != "" else "")
+    # Normalize ID
+    investern["_id_norm"] = investern["Investor ID"].apply(norm_key)
 
-# Commitment columns
-investern["Invester Commitment"] = pd.to_numeric(investern["Invester Commitment"], errors="coerce").fillna(0)
+    # Commitment columns
+    investern["Invester Commitment"] = pd.to_numeric(investern["Invester Commitment"], errors="coerce").fillna(0)
 
-# ✅ New SS Commitment mapping: from CDR Summary By Investor sheet
-investern["SS Commitment"] = investern["_id_norm"].map(investorid_to_commitment)
-investern["SS Commitment"] = pd.to_numeric(investern["SS Commitment"], errors="coerce").fillna(0)
+    # ✅ New SS Commitment mapping: from CDR Summary By Investor sheet
+    investern["SS Commitment"] = investern["_id_norm"].map(investorid_to_commitment)
+    investern["SS Commitment"] = pd.to_numeric(investern["SS Commitment"], errors="coerce").fillna(0)
 
-# SS Check (same logic)
-investern["SS Check"] = investern["SS Commitment"] - investern["Invester Commitment"]
+    # SS Check (same logic)
+    investern["SS Check"] = investern["SS Commitment"] - investern["Invester Commitment"]
 
 
     # ---- 5. Combine DataFrames ----
+    # Lay both frames side by side, three blank columns apart, in one
+    # pre-filled object array; the shorter side is padded with "".
     max_rows = max(len(df), len(investern))
-    spacer = pd.DataFrame({f"Empty_{i}": [""] * max_rows for i in range(3)}, dtype=object)
-    df = df.reindex(range(max_rows)).reset_index(drop=True)
-    investern = investern.reindex(range(max_rows)).reset_index(drop=True)
-
-    combined_df = pd.concat([df.astype(object), spacer, investern.astype(object)], axis=1)
+    left, right = df.shape[1], df.shape[1] + 3
+    combined = np.full((max_rows, right + investern.shape[1]), "", dtype=object)
+    combined[:len(df), :left] = df.to_numpy(dtype=object)
+    combined[:len(investern), right:] = investern.to_numpy(dtype=object)
+    combined_df = pd.DataFrame(
+        combined,
+        columns=[*df.columns, *(f"Empty_{i}" for i in range(3)), *investern.columns],
+    )
 
     # ---- 6. Add SS Subtotal Row ----
-    ss_total_commit = pd.to_numeric(investern["SS Commitment"], errors="coerce").fillna(0).sum()
-    ss_total_invest = pd.to_numeric(investern["Invester Commitment"], errors="coerce").fillna(0).sum()
+    ss_total_commit = investern["SS Commitment"].sum()
+    ss_total_invest = investern["Invester Commitment"].sum()
     ss_total_check = ss_total_commit - ss_total_invest
 
     subtotal_row = {col: "" for col in combined_df.columns}
@@ -146,31 +175,31 @@ investern["SS Check"] = investern["SS Commitment"] - investern["Invester Commitm
     # ---- 8. Final cleanup ----
     combined_df = clean_dataframe(combined_df)
 
-    # ---- 9. Write clean sheet ----
-    with pd.ExcelWriter(output_file, engine="openpyxl", mode="a") as writer:
-        combined_df.to_excel(writer, sheet_name="Commitment Sheet", index=False)
-
-    print("✅ Commitment Sheet created successfully — no NaN, no float+str errors, no helper columns.")
+    logger.info("✅ Commitment Sheet created successfully — no NaN, no float+str errors, no helper columns.")
     return combined_df
 
 
 # ---------------------------------------------------------
 # Step 2: Create Entry Sheet
 # ---------------------------------------------------------
-def create_entry_sheet_with_subtotals(commitment_df):
-    delete_sheet_if_exists(output_file, "Entry")
+def _allocation_blocks(df_raw):
+    """Yield each "Vehicle/Investor" table of allocation_data with its header applied."""
+    # Every header row starts a new run; rows before the first header (run 0) are skipped.
+    run_id = np.cumsum(df_raw.iloc[:, 0].to_numpy(dtype=object) == "Vehicle/Investor")
+    for run, block in df_raw.groupby(run_id, sort=False):
+        if run == 0:
+            continue
+        yield block.iloc[1:].set_axis(block.iloc[0], axis=1)
 
-    df_raw = pd.read_excel(wizard_file, sheet_name="allocation_data", engine="openpyxl", header=None)
-    header_rows = df_raw.index[df_raw.iloc[:, 0].astype(str) == "Vehicle/Investor"].tolist()
-    tables = []
 
-    for i, h in enumerate(header_rows):
-        start = h
-        end = header_rows[i + 1] if i + 1 < len(header_rows) else len(df_raw)
-        block = df_raw.iloc[start:end].reset_index(drop=True)
-        block.columns = block.iloc[0]
-        block = block.drop(0).reset_index(drop=True)
+def create_entry_sheet_with_subtotals(commitment_df, sheets=None):
+    if sheets is None:
+        sheets = read_input_sheets()
+
+    df_raw = sheets["allocation_data"]
+    tables = []
 
+    for block in _allocation_blocks(df_raw):
         if "Final LE Amount" in block.columns:
             block["Final LE Amount"] = pd.to_numeric(block["Final LE Amount"], errors="coerce").fillna(0)
             subtotal_val = block["Final LE Amount"].sum(skipna=True)
@@ -182,24 +211,25 @@ def create_entry_sheet_with_subtotals(commitment_df):
         if "Final LE Amount" in block.columns:
             subtotal_row["Final LE Amount"] = subtotal_val
 
-        block = pd.concat([block, pd.DataFrame([subtotal_row])], ignore_index=True)
         tables.append(block)
+        tables.append(pd.DataFrame([subtotal_row]))
 
     final_df = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
 
     id_col = "Investor ID" if "Investor ID" in final_df.columns else "Investor Id"
     final_df["_id_norm"] = final_df[id_col].apply(norm_key)
 
-    cm = commitment_df.copy()
-    cm["_inv_acct_norm"] = cm["Investran Acct ID"].apply(norm_key)
+    # commitment_df is only read here, so the normalized keys live in their own Series.
+    cm = commitment_df
+    inv_acct_norm = cm["Investran Acct ID"].apply(norm_key)
 
-    id_to_bin = (
-        cm.dropna(subset=["Bin ID"])
-        .drop_duplicates(subset=["_inv_acct_norm"])
-        .set_index("_inv_acct_norm")["Bin ID"]
-        .to_dict()
+    # One grouping pass yields both lookups; "first" skips missing Bin IDs.
+    per_acct = cm.groupby(inv_acct_norm, sort=False).agg(
+        bin_id=("Bin ID", "first"), amt=("Commitment Amount", "sum")
     )
-    id_to_amt = cm.groupby("_inv_acct_norm")["Commitment Amount"].sum().to_dict()
+    accts = per_acct.index.to_numpy()
+    id_to_bin = dict(zip(accts, per_acct["bin_id"].to_numpy()))
+    id_to_amt = dict(zip(accts, per_acct["amt"].to_numpy()))
 
     final_df["Bin ID"] = final_df["_id_norm"].map(id_to_bin)
     final_df["Commitment Amount"] = final_df["_id_norm"].map(id_to_amt)
@@ -208,37 +238,50 @@ def create_entry_sheet_with_subtotals(commitment_df):
     final_df.drop(columns=[c for c in final_df.columns if c.startswith("_")], inplace=True, errors="ignore")
     final_df = clean_dataframe(final_df)
 
-    with pd.ExcelWriter(output_file, engine="openpyxl", mode="a") as writer:
-        final_df.to_excel(writer, sheet_name="Entry", index=False)
+    logger.info("✅ Entry Sheet created successfully — clean and validated.")
+    return final_df
 
-    print("✅ Entry Sheet created successfully — clean and validated.")
+
+# ---------------------------------------------------------
+# Step 3: Write output workbook
+# ---------------------------------------------------------
+def _append_sheet(wb, sheet_name, df):
+    """Stream df into a new write-only sheet: header row, then one row per record."""
+    ws = wb.create_sheet(sheet_name)
+    ws.append([None if pd.isna(col) else col for col in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        ws.append(row)
+
+def write_output_sheets(commitment_df, entry_df):
+    """Write the Commitment and Entry sheets to output_file in one pass."""
+    wb = Workbook(write_only=True)
+    _append_sheet(wb, "Commitment Sheet", commitment_df)
+    _append_sheet(wb, "Entry", entry_df)
+    wb.save(output_file)
 
 # ---------------------------------------------------------
 # Main
 # ---------------------------------------------------------
 if __name__ == "__main__":
-    commitment_df = create_commitment_sheet()
-    create_entry_sheet_with_subtotals(commitment_df)
-    print("🎯 Automation completed successfully — all sheets clean, validated, and error-free!")
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    sheets = read_input_sheets()
+    commitment_df = create_commitment_sheet(sheets)
+    entry_df = create_entry_sheet_with_subtotals(commitment_df, sheets)
+    write_output_sheets(commitment_df, entry_df)
+    logger.info("🎯 Automation completed successfully — all sheets clean, validated, and error-free!")
 
 
 
-def create_entry_sheet_with_subtotals(commitment_df):
+def create_entry_sheet_with_subtotals(commitment_df, sheets=None):
     # DO NOT touch the Commitment sheet; only build Entry sheet
-    delete_sheet_if_exists(output_file, "Entry")
+    if sheets is None:
+        sheets = read_input_sheets()
 
     # 1) Read allocation_data and build the stacked table with subtotals (unchanged)
-    df_raw = pd.read_excel(wizard_file, sheet_name="allocation_data", engine="openpyxl", header=None)
-    header_rows = df_raw.index[df_raw.iloc[:, 0].astype(str) == "Vehicle/Investor"].tolist()
+    df_raw = sheets["allocation_data"]
     tables = []
 
-    for i, h in enumerate(header_rows):
-        start = h
-        end = header_rows[i + 1] if i + 1 < len(header_rows) else len(df_raw)
-        block = df_raw.iloc[start:end].reset_index(drop=True)
-        block.columns = block.iloc[0]
-        block = block.drop(0).reset_index(drop=True)
-
+    for block in _allocation_blocks(df_raw):
         if "Final LE Amount" in block.columns:
             block["Final LE Amount"] = pd.to_numeric(block["Final LE Amount"], errors="coerce").fillna(0)
             subtotal_val = block["Final LE Amount"].sum(skipna=True)
@@ -250,8 +293,8 @@ def create_entry_sheet_with_subtotals(commitment_df):
         if "Final LE Amount" in block.columns:
             subtotal_row["Final LE Amount"] = subtotal_val
 
-        block = pd.concat([block, pd.DataFrame([subtotal_row])], ignore_index=True)
         tables.append(block)
+        tables.append(pd.DataFrame([subtotal_row]))
 
     final_df = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
 
@@ -260,24 +303,22 @@ def create_entry_sheet_with_subtotals(commitment_df):
     final_df["_id_norm"] = final_df[id_col].apply(norm_key) if id_col in final_df.columns else ""
 
     # 3) Map Investor ID -> Bin ID from Commitment sheet (working part kept)
-    cm = commitment_df.copy()
+    cm = commitment_df
     # commitment_df already has "Investor ID" and "Bin ID"
-    cm["_id_norm"] = cm["Investor ID"].apply(norm_key)
-    id_to_bin_raw = (
-        cm.dropna(subset=["Bin ID"])
-          .drop_duplicates(subset=["_id_norm"])
-          .set_index("_id_norm")["Bin ID"]
-          .to_dict()
-    )
+    id_norm = cm["Investor ID"].apply(norm_key)
+    has_bin = cm["Bin ID"].notna().to_numpy()
+    keys, bins = id_norm.to_numpy()[has_bin], cm["Bin ID"].to_numpy()[has_bin]
+    # Zip in reverse so the first Bin ID seen for each key is the one kept.
+    id_to_bin_raw = dict(zip(keys[::-1], bins[::-1]))
     # Write Bin ID into Entry sheet
     final_df["Bin ID"] = final_df["_id_norm"].map(id_to_bin_raw)
 
     # 4) Build Account Number -> Investor Commitment map from CDR Summary By Investor
-    cdr = pd.read_excel(cdr_file, sheet_name="CDR Summary By Investor", engine="openpyxl", skiprows=2)
+    cdr = sheets["CDR Summary By Investor"].copy()
     cdr.columns = cdr.columns.str.strip()
     cdr["Account Number"] = cdr["Account Number"].astype(str).str.strip().str.upper()
     cdr["Investor Commitment"] = pd.to_numeric(cdr["Investor Commitment"], errors="coerce").fillna(0)
-    acct_to_commit = cdr.set_index("Account Number")["Investor Commitment"].to_dict()
+    acct_to_commit = dict(zip(cdr["Account Number"].to_numpy(), cdr["Investor Commitment"].to_numpy()))
 
     # 5) Using the fetched Bin ID (== Account Number), map Commitment Amount from CDR
     final_df["_bin_norm"] = final_df["Bin ID"].astype(str).str.strip().str.upper()
@@ -287,9 +328,7 @@ def create_entry_sheet_with_subtotals(commitment_df):
     final_df.drop(columns=[c for c in final_df.columns if c.startswith("_")], inplace=True, errors="ignore")
     final_df = clean_dataframe(final_df)
 
-    with pd.ExcelWriter(output_file, engine="openpyxl", mode="a") as writer:
-        final_df.to_excel(writer, sheet_name="Entry", index=False)
-
-    print("✅ Entry Sheet created successfully — Bin ID via Commitment sheet, Commitment Amount via CDR (Account Number).")
+    logger.info("✅ Entry Sheet created successfully — Bin ID via Commitment sheet, Commitment Amount via CDR (Account Number).")
+    return final_df
 
 
@@ -3,6 +3,32 @@ import hashlib
 import pandas as pd
 import time
 
+_HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+def get_file_hash(file_path):
+    """Return the SHA-256 hex digest of a file without reading it into memory whole.
+
+    Uses hashlib.file_digest on Python 3.11+, otherwise hashes fixed-size chunks.
+    A missing file hashes as empty.
+    """
+    if not os.path.exists(file_path):
+        return hashlib.sha256().hexdigest()
+    with open(file_path, "rb", buffering=0) as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        hasher = hashlib.sha256()
+        buf = memoryview(bytearray(_HASH_CHUNK_SIZE))
+        while n := f.readinto(buf):
+            hasher.update(buf[:n])
+        return hasher.hexdigest()
+
+
+def get_file_size(file_path):
+    """Return the file size in bytes, or 0 if it does not exist."""
+    return os.path.getsize(file_path) if os.path.exists(file_path) else 0
+
+
 def update_shared_excel_with_kpi(shared_drive_path, file_name, new_data):
     """
     Updates a master Excel file in a shared drive with multiple users while tracking KPIs.
@@ -27,52 +53,38 @@ def update_shared_excel_with_kpi(shared_drive_path, file_name, new_data):
     if not os.path.exists(shared_drive_path):
         return {"status": "Access denied. Shared drive not found."}
 
-    # Step 2: Function to get SHA-256 hash of the file
-    def get_file_hash(file_path):
-        hasher = hashlib.sha256()
-        if os.path.exists(file_path):
-            with open(file_path, "rb") as f:
-                hasher.update(f.read())
-        return hasher.hexdigest()
-
-    # Step 3: Function to get file size
-    def get_file_size(file_path):
-        return os.path.getsize(file_path) if os.path.exists(file_path) else 0
-
-    # Step 4: Acquire lock to prevent simultaneous editing
-    if os.path.exists(lock_file):
+    # Step 2: Acquire lock to prevent simultaneous editing
+    # O_EXCL makes the existence check and the creation one atomic call.
+    try:
+        os.close(os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
         return {"status": "Another user is editing. Try again later."}
-    open(lock_file, "w").close()
 
     # Track KPIs
     start_time = time.time()
-    initial_hash = get_file_hash(file_path)
     initial_size = get_file_size(file_path)
 
     try:
-        # Step 5: Load existing Excel file or create a new one
+        # Step 3: Load existing Excel file or create a new one
         if os.path.exists(file_path):
             df = pd.read_excel(file_path)
         else:
             df = pd.DataFrame()
 
-        # # Step 6: Append new data
+        # # Step 4: Append new data
         # initial_rows = len(df)
         # df = df.append(new_data, ignore_index=True)
         # rows_added = len(df) - initial_rows
         rows_added  = 30
 
-        # # Step 7: Save the updated file
+        # # Step 5: Save the updated file
         # df.to_excel(file_path, index=False)
 
-        # Step 8: Verify hash after modification
-        final_hash = get_file_hash(file_path)
+        # Step 6: Measure the file after the update. Nothing is written while
+        # Step 5 is disabled, so there is no before/after hash to compare.
         final_size = get_file_size(file_path)
         execution_time = round(time.time() - start_time, 2)  # In seconds
 
-        if final_hash != initial_hash:
-            return {"status": "File modified by another user. Update aborted."}
-
         # Return KPIs and success message
         return {
             "status": "File updated successfully.",
@@ -86,7 +98,7 @@ def update_shared_excel_with_kpi(shared_drive_path, file_name, new_data):
         return {"status": f"Error: {str(e)}"}
 
     finally:
-        # Step 9: Release lock
+        # Step 7: Release lock
         if os.path.exists(lock_file):
             os.remove(lock_file)
 
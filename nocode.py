@@ -16,11 +16,14 @@ Notes:
 - The Conn sheet's lookup key is taken from Excel column F (6th column). If the sheet has a column named 'F', that is used first; otherwise the 6th column header is used.
 """
 
+import logging
 import sys
 import os
 import pandas as pd
 from openpyxl import load_workbook
 
+logger = logging.getLogger(__name__)
+
 def find_sheet_case_insensitive(sheet_names, target_name):
     target_lower = target_name.lower().replace(" ", "")
     for name in sheet_names:
@@ -38,10 +41,10 @@ def main(file1, file2, output_file=None):
         output_file = file1
 
     if not os.path.exists(file1):
-        print(f"Error: file1 '{file1}' not found.")
+        logger.error("Error: file1 '%s' not found.", file1)
         return
     if not os.path.exists(file2):
-        print(f"Error: file2 '{file2}' not found.")
+        logger.error("Error: file2 '%s' not found.", file2)
         return
 
     # Read sheet names from first workbook
@@ -51,22 +54,22 @@ def main(file1, file2, output_file=None):
     # Find the CDR Summary By Investor sheet (case-insensitive)
     target_sheet_name = find_sheet_case_insensitive(sheet_names_1, "CDR Summary By Investor")
     if target_sheet_name is None:
-        print("Error: Could not find a sheet named like 'CDR Summary By Investor' in the first workbook.")
-        print("Available sheets:", sheet_names_1)
+        logger.error("Error: Could not find a sheet named like 'CDR Summary By Investor' in the first workbook.")
+        logger.error("Available sheets: %s", sheet_names_1)
         return
 
     # Read the lookup sheet (from file1)
     lookup_df = pd.read_excel(file1, sheet_name=target_sheet_name, engine="openpyxl", dtype=object)
     if lookup_df.shape[1] < 4:
-        print(f"Error: The lookup sheet '{target_sheet_name}' must have at least 4 columns (B:D present).")
-        print("Found columns:", list(lookup_df.columns))
+        logger.error("Error: The lookup sheet '%s' must have at least 4 columns (B:D present).", target_sheet_name)
+        logger.error("Found columns: %s", list(lookup_df.columns))
         return
 
     # Read the first sheet of file2 (source to copy into Conn)
     with pd.ExcelFile(file2, engine="openpyxl") as xls2:
         sheet_names_2 = xls2.sheet_names
         if len(sheet_names_2) == 0:
-            print("Error: second workbook contains no sheets.")
+            logger.error("Error: second workbook contains no sheets.")
             return
         source_sheet_name = sheet_names_2[0]
     conn_source_df = pd.read_excel(file2, sheet_name=0, engine="openpyxl", dtype=object)
@@ -82,8 +85,8 @@ def main(file1, file2, output_file=None):
         if conn_df.shape[1] >= 6:
             conn_lookup_col = conn_df.columns[5]  # 0-indexed; 5 => 6th column => Excel F
         else:
-            print("Error: Conn sheet (from second workbook) has fewer than 6 columns and no column named 'F'.")
-            print("Columns found:", list(conn_df.columns))
+            logger.error("Error: Conn sheet (from second workbook) has fewer than 6 columns and no column named 'F'.")
+            logger.error("Columns found: %s", list(conn_df.columns))
             return
 
     # Build mapping from lookup sheet: key from column B (index 1), value from column D (index 3)
@@ -132,14 +135,15 @@ def main(file1, file2, output_file=None):
                 df_sheet = pd.read_excel(file1, sheet_name=name, engine="openpyxl", dtype=object)
                 df_sheet.to_excel(writer, sheet_name=name, index=False)
 
-    print(f"Success. 'Conn' sheet added/updated in '{output_file}'.")
-    print(f" - Source Conn data taken from '{file2}' sheet '{source_sheet_name}'.")
-    print(f" - Lookup used sheet '{target_sheet_name}' from '{file1}', columns B (key) and D (value).")
-    print(" - The new column 'GS conn' has been appended to the Conn sheet.")
+    logger.info("Success. 'Conn' sheet added/updated in '%s'.", output_file)
+    logger.info(" - Source Conn data taken from '%s' sheet '%s'.", file2, source_sheet_name)
+    logger.info(" - Lookup used sheet '%s' from '%s', columns B (key) and D (value).", target_sheet_name, file1)
+    logger.info(" - The new column 'GS conn' has been appended to the Conn sheet.")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     if len(sys.argv) < 3:
-        print("Usage: python excel_vlookup_conn.py first_workbook.xlsx second_workbook.xlsx [output_workbook.xlsx]")
+        logger.error("Usage: python excel_vlookup_conn.py first_workbook.xlsx second_workbook.xlsx [output_workbook.xlsx]")
     else:
         file1 = sys.argv[1]
         file2 = sys.argv[2]
@@ -1,9 +1,17 @@
-def create_commitment_sheet():
-    ensure_output_file_exists()
-    delete_sheet_if_exists(output_file, "Commitment Sheet")
+def _cells_as_str(s):
+    """Render cells as read_excel(dtype=str) would: whole floats lose ".0", blanks stay NaN."""
+    return s.map(
+        lambda v: v if pd.isna(v)
+        else str(int(v)) if isinstance(v, float) and v.is_integer()
+        else str(v)
+    )
+
+def create_commitment_sheet(sheets=None):
+    if sheets is None:
+        sheets = read_input_sheets()
 
     # ---- 1. Load CDR Summary ----
-    cdr = cdr_file_data.copy()
+    cdr = sheets["CDR Summary By Investor"].copy()
     cdr.columns = cdr.columns.str.strip()
     cdr["Account Number"] = cdr["Account Number"].astype(str).str.strip()
     cdr["Investor ID"] = cdr["Investor ID"].astype(str).str.strip()
@@ -26,13 +34,11 @@ def create_commitment_sheet():
             bin_only_commit[row["_bin_norm"]] = row["Investor Commitment"]
 
     # ---- 2. Load Data_format ----
-    df = pd.read_excel(
-        wizard_file,
-        sheet_name="Data_format",
-        engine="openpyxl",
-        dtype={"Bin ID": str, "Investran Acct ID": str, "Legal Entity": str}
-    )
+    df = sheets["Data_format"].copy()
     df.columns = df.columns.str.strip()
+    # The shared sheets are parsed without per-column dtypes, so restore the text form here.
+    for col in ("Bin ID", "Investran Acct ID", "Legal Entity"):
+        df[col] = _cells_as_str(df[col])
 
     df["Legal Entity"] = df["Legal Entity"].astype(str).fillna("").str.strip()
     df["Bin ID"] = df["Bin ID"].astype(str).fillna("").str.strip()
@@ -56,48 +62,32 @@ def create_commitment_sheet():
     # --------------------------------------------------------------------
     # ⭐ STEP A — SMART SECTION DETECTION (WORKS EVEN IF FEEDER ANYWHERE)
     # --------------------------------------------------------------------
-    subtotal_mask = df["Legal Entity"].str.upper().str.contains("SUBTOTAL", na=False)
-    subtotal_indices = list(df.index[subtotal_mask])
-
-    section_id = []
-    current_section = -1
+    subtotal_mask = df["Legal Entity"].str.upper().str.contains("SUBTOTAL", regex=False, na=False)
 
-    for i in range(len(df)):
-        if i in subtotal_indices:
-            section_id.append(current_section)
-        else:
-            if i == 0 or (i - 1) in subtotal_indices:
-                current_section += 1
-            section_id.append(current_section)
-
-    df["SectionID"] = section_id
+    # A section starts on the first row and on every non-subtotal row that
+    # follows a subtotal; a subtotal row belongs to the section it closes.
+    section_start = ~subtotal_mask & subtotal_mask.shift(fill_value=True)
+    df["SectionID"] = section_start.cumsum() - 1
 
     # --------------------------------------------------------------------
     # ⭐ STEP B — GET GS SUBTOTAL FOR EACH SECTION
     # --------------------------------------------------------------------
-    section_totals = {}
-    for s in df["SectionID"].unique():
-        sec_df = df[df["SectionID"] == s]
-        subtotal_row = sec_df[sec_df["Legal Entity"].str.upper().str.contains("SUBTOTAL")]
-
-        if not subtotal_row.empty:
-            gs_total = float(subtotal_row["GS Commitment"].iloc[0] or 0)
-            section_totals[s] = gs_total
-        else:
-            section_totals[s] = 0
+    section_totals = (
+        df.loc[subtotal_mask]
+        .groupby("SectionID", sort=False)["GS Commitment"]
+        .first()
+        .astype(float)
+        .to_dict()
+    )
 
     # --------------------------------------------------------------------
     # ⭐ STEP C — APPLY FEEDER FIX (FINAL DF DIRECT UPDATE)
     # --------------------------------------------------------------------
-    feeder_mask = df["Bin ID"].str.upper().str.contains("FEEDER", na=False)
-    feeder_indices = df[feeder_mask].index
+    feeder_mask = df["Bin ID"].str.upper().str.contains("FEEDER", regex=False, na=False)
+    feeder_gs = df.loc[feeder_mask, "SectionID"].map(section_totals).fillna(0)
 
-    for idx in feeder_indices:
-        sec = df.loc[idx, "SectionID"]
-        subtotal_gs = section_totals.get(sec, 0)
-
-        df.loc[idx, "GS Commitment"] = subtotal_gs
-        df.loc[idx, "GS Check"] = df.loc[idx, "Commitment Amount"] - subtotal_gs
+    df.loc[feeder_mask, "GS Commitment"] = feeder_gs
+    df.loc[feeder_mask, "GS Check"] = df.loc[feeder_mask, "Commitment Amount"] - feeder_gs
 
     # --------------------------------------------------------------------
     # ⭐ NOW FEEDER GS IS 100% CORRECT  
@@ -105,15 +95,12 @@ def create_commitment_sheet():
     # --------------------------------------------------------------------
 
     # ---- 4. SS Commitment ----
-    ss_source = df.groupby("_bin_norm")["Commitment Amount"].sum().to_dict()
+    ss_sums = df.groupby("_bin_norm", sort=False)["Commitment Amount"].sum()
+    ss_source = dict(zip(ss_sums.index.to_numpy(), ss_sums.to_numpy()))
 
-    investern = pd.read_excel(
-        wizard_file,
-        sheet_name="investern_format",
-        engine="openpyxl",
-        dtype={"Account Number": str}
-    )
+    investern = sheets["investern_format"].copy()
     investern.columns = investern.columns.str.strip()
+    investern["Account Number"] = _cells_as_str(investern["Account Number"])
 
     investern["Account Number"] = investern["Account Number"].astype(str).str.upper().str.strip()
     investern["_id_norm"] = investern["Account Number"].apply(norm_key)
@@ -125,13 +112,17 @@ def create_commitment_sheet():
     investern["SS Commitment"] = investern["_id_norm"].map(ss_source).fillna(0)
     investern["SS Check"] = investern["SS Commitment"] - investern["Invester Commitment"]
 
+    # Lay both frames side by side, three blank columns apart, in one
+    # pre-filled object array; the shorter side is padded with "".
     max_rows = max(len(df), len(investern))
-    spacer = pd.DataFrame({f"Empty_{i}": [""] * max_rows for i in range(3)}, dtype=object)
-
-    df = df.reindex(range(max_rows)).reset_index(drop=True)
-    investern = investern.reindex(range(max_rows)).reset_index(drop=True)
-
-    combined_df = pd.concat([df.astype(object), spacer, investern.astype(object)], axis=1)
+    left, right = df.shape[1], df.shape[1] + 3
+    combined = np.full((max_rows, right + investern.shape[1]), "", dtype=object)
+    combined[:len(df), :left] = df.to_numpy(dtype=object)
+    combined[:len(investern), right:] = investern.to_numpy(dtype=object)
+    combined_df = pd.DataFrame(
+        combined,
+        columns=[*df.columns, *(f"Empty_{i}" for i in range(3)), *investern.columns],
+    )
 
     subtotal_row = {col: "" for col in combined_df.columns}
     subtotal_row.update({
@@ -146,8 +137,6 @@ def create_commitment_sheet():
     combined_df.drop(columns=internal_cols, inplace=True, errors="ignore")
     combined_df = clean_dataframe(combined_df)
 
-    with pd.ExcelWriter(output_file, engine="openpyxl", mode="a") as writer:
-        combined_df.to_excel(writer, sheet_name="Commitment Sheet", index=False)
-
-    print("Commitment Sheet created successfully.")
+    # Not written here; the caller saves it with write_output_sheets() alongside the Entry sheet.
+    logger.info("Commitment Sheet created successfully.")
     return combined_df